@@ -424,7 +424,7 @@ event.waitKeys()
 
 # Start staircase
 current_run=0
-total_run=range(4)
+total_run=range(params.staircase_nruns)
 for current_run in total_run:
     # create the staircase handler
     if params.staircase_style == 'QUEST':
@@ -550,7 +550,7 @@ for current_run in total_run:
         win.flip()
         core.wait(rand_unif_int(params.iti_min, params.iti_max))
         # core.wait(params.fixation_grating_isi)
-    if current_run<3:
+    if current_run<params.staircase_nruns-1:
         message='Well done! You have finished Session %i. \n\nPress SPACE bar to continue.'%(current_run+1)
         intru_break = visual.TextStim(win, pos=[0, 0], text = message)
         intru_break.draw()
@@ -56,6 +56,7 @@ min_secs = 2 * 1/85                  # Require two frames to generate motion
 
 staircase_style = 'QUEST'               # 'simple' or 'QUEST'
 staircase_ntrials = 30
+staircase_nruns = 4                     # Number of staircase runs per participant
 
 conditions_QUEST = [
     {'label':'hi_contr', 'startVal':start_secs, 'startValSd':max_secs_sd, 'pThreshold':.82, 'max_contr':.98, 'minVal':min_secs, 'maxVal':max_secs, 
@@ -85,4 +86,17 @@ isi_max = .50                          # Fixation/grating ISI max val
 iti_min = 1.0                           # ITI min val
 iti_max = 2.5                           # ITI max val
 
+# Power simulation (motion_temporal_threshold_power.py)
+# Group thresholds are log-normal in secs; medians and spreads are placeholders, not Murray et al. estimates
+power_groups = [
+    {'label':'male', 'median_secs':.060, 'log10_sd':.15},
+    {'label':'female', 'median_secs':.075, 'log10_sd':.15}
+]
+power_n_per_group = [10, 20, 30, 40, 60, 80]    # Participants per group
+power_ntrials = [20, 30, 40, 60]                # Staircase trials per run
+power_n_reps = 500                      # Simulated cohorts per cell
+power_alpha = .05                       # Two-sided Welch t-test criterion
+power_obs_slope = 3                     # Weibull slope of simulated observers (linear secs)
+power_obs_lapse = .01                   # Lapse rate of simulated observers
+
 # win.close()
\ No newline at end of file
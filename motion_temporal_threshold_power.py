@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------------------------------------
+# Power analysis for the male/female difference in motion duration thresholds
+#-----------------------------------------------------------------------------------------------------------
+"""
+Simulation-based power analysis for the Murray et al. 2018 replication.
+
+Simulated observers are drawn from the group threshold distributions in motion_temporal_threshold_params.py
+(power_groups). Every observer completes staircase_nruns runs of the configured QUEST staircase, and all
+staircases in a batch of cohorts are stepped together with NumPy. An observer's threshold is the mean of the
+final QUEST estimates across runs. Power is the proportion of cohorts in which a two-sided Welch t-test on
+those thresholds is significant at power_alpha. Batches of cohorts are spread across a process pool.
+
+The QUEST update and trial placement follow psychopy.data.QuestHandler with its default beta, delta, gamma,
+grain and 'quantile' method (Pelli's optimal quantile order), so no PsychoPy install is needed.
+test_quest_port.py checks the port against psychopy.contrib.quest when PsychoPy is installed.
+
+Runtime is roughly 15 minutes per CPU core for the default grid and power_n_reps = 500; use a smaller
+--n-reps for a quick preview.
+
+Usage:
+    python motion_temporal_threshold_power.py [--n-reps 500] [--workers 4] [--seed 0]
+        [--out motion_temporal_threshold_power.csv]
+"""
+
+#-----------------------------------------------------------------------------------------------------------
+# Initialize
+#-----------------------------------------------------------------------------------------------------------
+
+from __future__ import absolute_import, division, print_function
+import argparse, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy
+from scipy.stats import ttest_ind
+
+# user-defined parameters
+import motion_temporal_threshold_params as params
+
+# psychopy.data.QuestHandler defaults, used when a condition does not set them
+quest_defaults = {'beta':3.5, 'delta':0.01, 'gamma':0.5, 'grain':0.01}
+quest_dim = 500
+
+# Staircases per batch; bounds the (staircases x grid) posterior array at ~80 MB
+max_staircases_per_batch = 20000
+
+#-----------------------------------------------------------------------------------------------------------
+# Define helper functions
+#-----------------------------------------------------------------------------------------------------------
+
+def quest_settings(condition):
+    q = dict(quest_defaults)
+    q.update(condition)
+    # Candidate thresholds and prior, as in psychopy.contrib.quest.QuestObject
+    x = numpy.arange(-quest_dim//2, quest_dim//2 + 1) * q['grain']
+    q['t_cand'] = q['startVal'] + x
+    q['prior'] = numpy.exp(-0.5 * (x/q['startValSd'])**2)
+    q['prior'] /= q['prior'].sum()
+    # Offset that puts pThreshold at the candidate threshold
+    x2 = numpy.arange(-quest_dim, quest_dim + 1) * q['grain']
+    q['x_threshold'] = numpy.interp(q['pThreshold'], quest_psi(q, x2, 0), x2)
+    # Likelihood over candidates for each response and grain-rounded intensity, indexed
+    # [response, quest_dim//2 - round((intensity - startVal)/grain), candidate]
+    p2 = quest_psi(q, x2)
+    s2 = numpy.array([1 - p2, p2])[:, ::-1]
+    q['s2_rows'] = numpy.stack([s2[:, i:i + quest_dim + 1] for i in range(quest_dim + 1)], axis=1)
+    # Pelli's optimal quantile order, which QuestHandler uses to place each trial
+    eps = 1e-14
+    pL, pH = p2[0], p2[-1]
+    pE = pH*numpy.log(pH+eps) - pL*numpy.log(pL+eps) + (1-pH+eps)*numpy.log(1-pH+eps) - (1-pL+eps)*numpy.log(1-pL+eps)
+    pE = 1/(1 + numpy.exp(pE/(pL-pH)))
+    q['quantile_order'] = (pE-pL)/(pH-pL)
+    return q
+
+def quest_psi(q, secs_from_threshold, x_threshold=None):
+    if x_threshold is None:
+        x_threshold = q['x_threshold']
+    delta, gamma = q['delta'], q['gamma']
+    return delta*gamma + (1-delta)*(1 - (1-gamma)*numpy.exp(-10**(q['beta']*(secs_from_threshold + x_threshold))))
+
+def quest_quantile(q, pdf, order):
+    # Row-wise interpolated quantile of normalized posteriors
+    cdf = numpy.cumsum(pdf, axis=1)
+    idx = numpy.maximum(numpy.argmax(cdf >= order, axis=1), 1)
+    rows = numpy.arange(pdf.shape[0])
+    c_lo = cdf[rows, idx-1]
+    c_hi = cdf[rows, idx]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        frac = numpy.clip(numpy.nan_to_num((order - c_lo)/(c_hi - c_lo)), 0, 1)
+    t_lo = q['t_cand'][idx-1]
+    return t_lo + frac*(q['t_cand'][idx] - t_lo)
+
+def quest_update(q, pdf, stim_secs, correct):
+    # Intensity rounded to the QUEST grain, as in QuestObject.update
+    ii = quest_dim//2 - numpy.rint((stim_secs - q['startVal'])/q['grain']).astype(int)
+    pdf *= q['s2_rows'][correct, numpy.clip(ii, 0, quest_dim)]
+    pdf /= pdf.sum(axis=1, keepdims=True)
+    return numpy.clip(quest_quantile(q, pdf, q['quantile_order']), q['minVal'], q['maxVal'])
+
+def observer_p_correct(q, stim_secs, threshold_secs):
+    # Weibull in linear secs with p(threshold_secs) == pThreshold
+    gamma, lapse = q['gamma'], params.power_obs_lapse
+    k = -numpy.log(1 - (q['pThreshold'] - gamma)/(1 - gamma - lapse))
+    return gamma + (1 - gamma - lapse)*(1 - numpy.exp(-k*(stim_secs/threshold_secs)**params.power_obs_slope))
+
+def run_staircases(q, threshold_secs, ntrials, rng):
+    """Run one QUEST staircase per element of threshold_secs and return the final QUEST mean estimates."""
+    threshold_secs = numpy.asarray(threshold_secs, dtype=float)
+    true_secs = threshold_secs.reshape(-1)
+    n = true_secs.size
+    pdf = numpy.tile(q['prior'], (n, 1))
+    stim_secs = numpy.full(n, q['startVal'])
+    for trial_n in range(ntrials):
+        correct = (rng.random(n) < observer_p_correct(q, stim_secs, true_secs)).astype(int)
+        stim_secs = quest_update(q, pdf, stim_secs, correct)
+    return (pdf @ q['t_cand']).reshape(threshold_secs.shape)
+
+def draw_thresholds(n_reps, n_per_group, rng):
+    # (n_reps, n_groups, n_per_group), log-normal around each group median
+    median = numpy.array([g['median_secs'] for g in params.power_groups])[None, :, None]
+    log10_sd = numpy.array([g['log10_sd'] for g in params.power_groups])[None, :, None]
+    z = rng.standard_normal((n_reps, len(params.power_groups), n_per_group))
+    return median * 10**(log10_sd*z)
+
+def simulate_batch(condition, n_per_group, ntrials, n_reps, seed):
+    """Simulate n_reps cohorts and return the number with a significant group difference."""
+    rng = numpy.random.default_rng(seed)
+    q = quest_settings(condition)
+    thresholds = draw_thresholds(n_reps, n_per_group, rng)
+    runs = numpy.repeat(thresholds[..., None], params.staircase_nruns, axis=-1)
+    est = run_staircases(q, runs, ntrials, rng).mean(axis=-1)
+    t, p = ttest_ind(est[:, 0], est[:, 1], axis=1, equal_var=False)
+    return int(numpy.sum(p < params.power_alpha))
+
+def power_curves(condition, n_per_group, ntrials, n_reps, workers, seed):
+    cells = [(n, t) for n in n_per_group for t in ntrials]
+    tasks = []
+    for n, t in cells:
+        per_batch = max(1, max_staircases_per_batch // (2*n*params.staircase_nruns))
+        for start in range(0, n_reps, per_batch):
+            tasks.append((n, t, min(per_batch, n_reps - start)))
+    seeds = numpy.random.SeedSequence(seed).spawn(len(tasks))
+    hits = dict((cell, 0) for cell in cells)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(simulate_batch, condition, n, t, reps, s) for (n, t, reps), s in zip(tasks, seeds)]
+        for (n, t, reps), f in zip(tasks, futures):
+            hits[(n, t)] += f.result()
+    return dict((cell, hits[cell]/n_reps) for cell in cells)
+
+def write_power_curves(power, n_reps, fileName):
+    with open(fileName, 'w') as f:
+        f.write('n_per_group,ntrials,n_runs,n_reps,alpha,power\n')
+        for (n, t) in sorted(power):
+            f.write('%i,%i,%i,%i,%.3f,%.4f\n' % (n, t, params.staircase_nruns, n_reps, params.power_alpha, power[(n, t)]))
+
+#-----------------------------------------------------------------------------------------------------------
+# Run simulation
+#-----------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Power curves for the male/female duration threshold difference.')
+    parser.add_argument('--condition', default=params.conditions_QUEST[0]['label'], help='conditions_QUEST label')
+    parser.add_argument('--n-reps', type=int, default=params.power_n_reps, help='simulated cohorts per cell')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all CPUs)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default='motion_temporal_threshold_power.csv', help='output csv file, written to the current directory by default')
+    args = parser.parse_args()
+
+    if params.staircase_style != 'QUEST':
+        sys.exit("Power simulation only supports staircase_style = 'QUEST'.")
+    conditions = [c for c in params.conditions_QUEST if c['label'] == args.condition]
+    if not conditions:
+        sys.exit('No QUEST condition labelled %s.' % args.condition)
+
+    print('Simulating %i cohorts per cell: %s vs %s, %i runs, pThreshold %.2f' % (args.n_reps,
+        params.power_groups[0]['label'], params.power_groups[1]['label'], params.staircase_nruns, conditions[0]['pThreshold']))
+    start_time = time.time()
+    power = power_curves(conditions[0], params.power_n_per_group, params.power_ntrials, args.n_reps, args.workers, args.seed)
+    print('Done in %.1f s.' % (time.time() - start_time))
+
+    # N per group down the rows, trials per run across the columns
+    print('n/group' + ''.join('%8i' % t for t in params.power_ntrials))
+    for n in params.power_n_per_group:
+        print('%7i' % n + ''.join('%8.3f' % power[(n, t)] for t in params.power_ntrials))
+    write_power_curves(power, args.n_reps, args.out)
+    print('Saved %s' % os.path.abspath(args.out))
@@ -0,0 +1,30 @@
+# check the NumPy QUEST port in motion_temporal_threshold_power.py against psychopy.contrib.quest
+import numpy
+import motion_temporal_threshold_params as params
+import motion_temporal_threshold_power as power
+
+try:
+    from psychopy.contrib.quest import QuestObject
+except ImportError:
+    QuestObject = None
+
+if QuestObject is None:
+    print('psychopy not installed, skipping QUEST port check.')
+else:
+    condition = params.conditions_QUEST[0]
+    q = power.quest_settings(condition)
+    pq = QuestObject(condition['startVal'], condition['startValSd'], condition['pThreshold'],
+        q['beta'], q['delta'], q['gamma'], grain=q['grain'])
+    assert numpy.isclose(q['quantile_order'], pq.quantileOrder)
+
+    # fixed response sequence, same clipped intensity fed to both
+    responses = numpy.random.RandomState(2018).random_sample(60) < .7
+    pdf = q['prior'][None, :].copy()
+    stim_secs = numpy.array([condition['startVal']])
+    for response in responses:
+        pq.update(stim_secs[0], int(response))
+        expected = min(max(pq.quantile(), condition['minVal']), condition['maxVal'])
+        stim_secs = power.quest_update(q, pdf, stim_secs, numpy.array([int(response)]))
+        assert numpy.isclose(stim_secs[0], expected), (stim_secs[0], expected)
+    assert numpy.isclose(pdf[0] @ q['t_cand'], pq.mean())
+    print('QUEST port matches psychopy.contrib.quest.')